@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
 if __name__ == '__main__':
+    from multiprocessing import freeze_support
+    freeze_support()
     from av1an.__main__ import main
     main()
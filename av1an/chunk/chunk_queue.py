@@ -1,4 +1,6 @@
+import concurrent.futures
 import json
+import os
 from pathlib import Path
 from typing import List
 from subprocess import Popen, DEVNULL
@@ -7,11 +9,11 @@ from shlex import split
 from av1an.project import Project
 from av1an.chunk import Chunk
 from av1an.encoder import ENCODERS
-from av1an.ffmpeg import get_keyframes
+from av1an.ffmpeg import get_keyframes, frame_probe_packets
 from av1an.logger import log
 from av1an.resume import read_done_data
 from av1an.split import segment
-from av1an.utils import terminate
+from av1an.utils import terminate, frame_probe
 from av1an.vapoursynth import create_vs_file
 
 
@@ -270,10 +272,12 @@ def create_video_queue_segment(project: Project,
     # segment into separate files
     segment(project.input, project.temp, split_locations)
 
-    # get the names of all the split files
+    # get the names and sizes of all the split files in a single directory scan
     source_path = project.temp / 'split'
-    queue_files = [x for x in source_path.iterdir() if x.suffix == '.mkv']
-    queue_files.sort(key=lambda p: p.stem)
+    with os.scandir(source_path) as it:
+        queue_files = [(Path(e.path), e.stat().st_size) for e in it
+                       if e.name.endswith('.mkv')]
+    queue_files.sort(key=lambda f: f[0].stem)
 
     if len(queue_files) == 0:
         er = 'Error: No files found in temp/split, probably splitting not working'
@@ -281,22 +285,42 @@ def create_video_queue_segment(project: Project,
         log(er)
         terminate()
 
+    # count frames of every split file once, by counting packets so files don't have to be decoded
+    files = [file for file, _ in queue_files]
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=os.cpu_count()) as executor:
+        frame_counts = list(executor.map(frame_probe_packets, files))
+
+    # decode the files where packets can't be counted as frames
+    uncounted = [i for i, frames in enumerate(frame_counts) if frames == 0]
+    if uncounted:
+        log(f'Decoding {len(uncounted)} split files to count frames\n')
+        # each probe is a full multithreaded ffmpeg decode, so only run a few at once
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 1) // 4)) as executor:
+            decoded = executor.map(frame_probe, [files[i] for i in uncounted])
+            for i, frames in zip(uncounted, decoded):
+                frame_counts[i] = frames
+
     chunk_queue = [
-        create_chunk_from_segment(project, index, file)
-        for index, file in enumerate(queue_files)
+        create_chunk_from_segment(project, index, file, file_size, frames)
+        for index, ((file, file_size),
+                    frames) in enumerate(zip(queue_files, frame_counts))
     ]
 
     return chunk_queue
 
 
-def create_chunk_from_segment(project: Project, index: int,
-                              file: Path) -> Chunk:
+def create_chunk_from_segment(project: Project, index: int, file: Path,
+                              file_size: int, frames: int) -> Chunk:
     """
     Creates a Chunk object from a segment file generated by ffmpeg
 
     :param project: the Project
     :param index: the index of the chunk
     :param file: the segmented file
+    :param file_size: size of the segmented file in bytes
+    :param frames: number of frames in the segmented file
     :return: A Chunk
     """
     ffmpeg_gen_cmd = [
@@ -304,8 +328,6 @@ def create_chunk_from_segment(project: Project, index: int,
         file.as_posix(), *project.pix_format, '-color_range', '0', '-f',
         'yuv4mpegpipe', '-'
     ]
-    file_size = file.stat().st_size
-    frames = project.get_frames()
     extension = ENCODERS[project.encoder].output_extension
 
     chunk = Chunk(project.temp, index, ffmpeg_gen_cmd, extension, file_size,
@@ -18,10 +18,9 @@ def vvc_concat(temp: Path, output: Path):
     """
     encode_files = sorted((temp / 'encode').iterdir())
     bitstreams = [x.as_posix() for x in encode_files]
-    bitstreams = ' '.join(bitstreams)
-    cmd = f'vvc_concat  {bitstreams} {output.as_posix()}'
+    cmd = ['vvc_concat', *bitstreams, output.as_posix()]
 
-    output = subprocess.run(cmd, shell=True)
+    subprocess.run(cmd)
 
 
 def concatenate_ffmpeg(temp: Path, output: Path, encoder: str):
@@ -88,12 +87,12 @@ def concatenate_mkvmerge(temp: Path, output):
 
     log('Concatenating\n')
 
-    output = shlex.quote(output.as_posix())
+    output = output.as_posix()
 
     encode_files = sorted((temp / 'encode').iterdir(),
                           key=lambda x: int(x.stem)
                           if x.stem.isdigit() else x.stem)
-    encode_files = [shlex.quote(f.as_posix()) for f in encode_files]
+    encode_files = [f.as_posix() for f in encode_files]
 
     if platform.system() == "Linux":
         import resource
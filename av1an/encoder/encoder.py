@@ -1,11 +1,11 @@
 from abc import ABC, abstractmethod
-from distutils.spawn import find_executable
 from typing import Tuple, Optional
 import subprocess
 from subprocess import PIPE, STDOUT
 from av1an.project import Project
 from chunk import Chunk
 from av1an.commandtypes import Command, MPCommands
+from av1an.utils import set_pipe_size, which
 
 
 class Encoder(ABC):
@@ -117,10 +117,12 @@ class Encoder(ABC):
         ffmpeg_gen_pipe = subprocess.Popen(c.ffmpeg_gen_cmd,
                                            stdout=PIPE,
                                            stderr=STDOUT)
+        set_pipe_size(ffmpeg_gen_pipe.stdout)
         ffmpeg_pipe = subprocess.Popen(filter_cmd,
                                        stdin=ffmpeg_gen_pipe.stdout,
                                        stdout=PIPE,
                                        stderr=STDOUT)
+        set_pipe_size(ffmpeg_pipe.stdout)
         pipe = subprocess.Popen(enc_cmd,
                                 stdin=ffmpeg_pipe.stdout,
                                 stdout=PIPE,
@@ -145,7 +147,7 @@ class Encoder(ABC):
         Verifies that this encoder exists in the system path and is ok to use
         :return: True if the encoder bin exists
         """
-        return find_executable(self.encoder_bin) is not None
+        return which(self.encoder_bin) is not None
 
     def on_before_chunk(self, project: Project, chunk: Chunk) -> None:
         """
@@ -1,6 +1,5 @@
 import os
 import subprocess
-from distutils.spawn import find_executable
 from pathlib import Path
 from subprocess import PIPE, STDOUT
 from typing import Tuple, Optional
@@ -11,7 +10,7 @@ from av1an.chunk import Chunk
 from av1an.commandtypes import MPCommands, CommandPair, Command
 from .encoder import Encoder
 from av1an.logger import log
-from av1an.utils import list_index_of_regex
+from av1an.utils import list_index_of_regex, which
 
 
 class Vvc(Encoder):
@@ -96,7 +95,7 @@ class Vvc(Encoder):
 
     def is_valid(self, project: Project) -> Tuple[bool, Optional[str]]:
         # vvc requires a special concat executable
-        if not find_executable('vvc_concat'):
+        if not which('vvc_concat'):
             return False, 'vvc concatenation executable "vvc_concat" not found'
 
         # make sure there's a vvc config file
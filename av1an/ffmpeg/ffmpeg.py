@@ -3,12 +3,15 @@
 import re
 import subprocess
 from pathlib import Path
-from subprocess import PIPE, STDOUT
+from subprocess import PIPE
 from typing import List
 from av1an.logger import log
 
 # TODO: redo to module, add ffmpeg scenedetection for fallback
 
+# Codecs that can store several frames in one packet (packed bitstream)
+PACKED_FRAMES_CODECS = ('mpeg4', )
+
 
 def frame_probe_ffmpeg(source: Path):
     """
@@ -26,6 +29,26 @@ def frame_probe_ffmpeg(source: Path):
     return int(matches[-1])
 
 
+def frame_probe_packets(source: Path):
+    """
+    Get frame count by counting video packets without decoding them.
+    Fast, but only precise for files with one frame per packet
+    :param: source: Path to input file
+    :return: packet count, 0 if it couldn't be read or codec can pack several frames in a packet
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+        "-show_entries", "stream=codec_name,nb_read_packets", "-of",
+        "csv=p=0",
+        source.as_posix()
+    ]
+    r = subprocess.run(cmd, stdout=PIPE, stderr=PIPE)
+    codec, _, packets = r.stdout.decode("utf-8").strip().partition(',')
+    if codec in PACKED_FRAMES_CODECS or not packets.isdigit():
+        return 0
+    return int(packets)
+
+
 def get_frametypes(file: Path) -> List:
     """
     Read file and return list with all frame types
@@ -97,12 +120,12 @@ def extract_audio(input_vid: Path, temp, audio_params):
 
     # Checking is source have audio track
     check = [
-        'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-ss', '0', '-i',
-        input_vid.as_posix(), '-t', '0', '-vn', '-c:a', 'copy', '-f', 'null',
-        '-'
+        'ffprobe', '-v', 'error', '-select_streams', 'a', '-show_entries',
+        'stream=index', '-of', 'csv=p=0',
+        input_vid.as_posix()
     ]
     is_audio_here = len(
-        subprocess.run(check, stdout=PIPE, stderr=STDOUT).stdout) == 0
+        subprocess.run(check, stdout=PIPE, stderr=PIPE).stdout.strip()) > 0
 
     # If source have audio track - process it
     if is_audio_here:
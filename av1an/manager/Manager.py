@@ -1,3 +1,4 @@
+import concurrent.futures
 import json
 import shutil
 import sys
@@ -57,13 +58,13 @@ class Main:
 
                 continue
             try:
-                tm = time.time()
+                tm = time.perf_counter()
 
                 if len(self.projects) > 1:
                     print(f":: Encoding file {proj.input.name}")
                 EncodingManager().encode_file(proj)
 
-                print(f'Finished: {round(time.time() - tm, 1)}s\n')
+                print(f'Finished: {round(time.perf_counter() - tm, 1)}s\n')
             except KeyboardInterrupt:
                 print('Encoding stopped')
                 sys.exit()
@@ -86,16 +87,20 @@ class EncodingManager:
         project.setup()
         set_log(project.logging, project.temp)
 
-        # find split locations
-        split_locations = split_routine(project, project.resume)
-
-        # create a chunk queue
-        chunk_queue = load_or_gen_chunk_queue(project, project.resume,
-                                              split_locations)
-
-        self.done_file(project, chunk_queue)
-        if not project.resume:
-            extract_audio(project.input, project.temp, project.audio_params)
+        if project.resume:
+            split_locations, chunk_queue = self.create_chunk_queue(project)
+        else:
+            # extract audio in the background, it only reads the input and doesn't depend on splitting.
+            # leaving the with block waits for extraction, even if splitting failed
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1) as audio_executor:
+                audio_future = audio_executor.submit(extract_audio,
+                                                     project.input,
+                                                     project.temp,
+                                                     project.audio_params)
+                split_locations, chunk_queue = self.create_chunk_queue(
+                    project)
+                audio_future.result()
 
             if project.reuse_first_pass:
                 segment_first_pass(project.temp, split_locations)
@@ -126,6 +131,23 @@ class EncodingManager:
         if not project.keep:
             shutil.rmtree(project.temp)
 
+    def create_chunk_queue(self, project: Project):
+        """
+        Finds split locations, creates the chunk queue and the done file for it
+
+        :param project: The project for this encode
+        :return: split locations and the chunk queue
+        """
+        # find split locations
+        split_locations = split_routine(project, project.resume)
+
+        # create a chunk queue
+        chunk_queue = load_or_gen_chunk_queue(project, project.resume,
+                                              split_locations)
+
+        self.done_file(project, chunk_queue)
+        return split_locations, chunk_queue
+
     def done_file(self, project: Project, chunk_queue: List[Chunk]):
         done_path = project.temp / 'done.json'
         if project.resume and done_path.exists():
@@ -2,15 +2,17 @@ import time
 import sys
 import concurrent
 import concurrent.futures
-from typing import List
+import multiprocessing
+import queue
+from typing import Optional
 from av1an.target_quality import (per_frame_target_quality_routine,
                                   per_shot_target_quality_routine)
 from av1an.encoder import ENCODERS
 from av1an.utils import frame_probe, terminate
-from av1an.resume import write_progress_file
+from av1an.resume import DoneTracker
 from av1an.chunk import Chunk
-from av1an.logger import log
-from pathlib import Path
+from av1an.project import Project
+from av1an.logger import log, log_file, logger
 from .Pipes import tqdm_bar
 
 
@@ -22,99 +24,204 @@ class Queue:
         self.chunk_queue = chunk_queue
         self.queue = []
         self.project = project
-        self.thread_executor = concurrent.futures.ThreadPoolExecutor()
+        # frame checks decode the whole chunk, so don't run more of them than encodes.
+        # workers is 0 when resuming with every chunk done
+        self.thread_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, project.workers))
+        # finished encodes and frame checks, handled in the order they finish
+        self.completed = queue.Queue()
+        self.done_tracker = DoneTracker(project.temp / 'done.json')
         self.status = 'Ok'
 
     def encoding_loop(self):
-        if len(self.chunk_queue) != 0:
-            with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=self.project.workers) as executor:
-                future_cmd = {
-                    executor.submit(self.encode_chunk, cmd): cmd
-                    for cmd in self.chunk_queue
-                }
-                for future in concurrent.futures.as_completed(future_cmd):
-                    try:
-                        future.result()
-                    except Exception as exc:
-                        _, _, exc_tb = sys.exc_info()
-                        print(f'Encoding error {exc}\nAt line {exc_tb.tb_lineno}')
-                        terminate()
+        self.done_tracker.start()
+        try:
+            self.run_workers()
+        finally:
+            # encodes still running when the loop stopped finished while the pool shut down
+            self.verify_remaining()
+            # wait for outstanding frame checks and save progress for resuming
+            self.thread_executor.shutdown(wait=True)
+            self.done_tracker.stop()
         self.project.counter.close()
 
-    def encode_chunk(self, chunk: Chunk):
+    def run_workers(self):
+        if len(self.chunk_queue) != 0:
+            # Workers are separate processes so the python side of each encode
+            # (target quality probing, pipe reading) doesn't contend for the GIL
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.project.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(logger.set_file, )) as executor:
+                # finished encodes and frame checks are passed back through a queue and handled
+                # as they finish, so a slow chunk doesn't hold back checking and saving progress
+                # of the ones queued after it
+                def put_completed(chunk, restart_count=None):
+                    # restart_count is only passed for frame checks
+                    return lambda future: self.completed.put(
+                        (future, chunk, restart_count))
+
+                for chunk in self.chunk_queue:
+                    executor.submit(encode_chunk, self.project,
+                                    chunk).add_done_callback(
+                                        put_completed(chunk))
+                pending = len(self.chunk_queue)
+
+                try:
+                    while pending:
+                        future, chunk, restart_count = self.completed.get()
+                        pending -= 1
+
+                        if restart_count is None:
+                            restart_count = future.result()
+                            if restart_count is None:
+                                self.status = 'FATAL'
+                                continue
+                            # verify the output in the background, so the freed worker
+                            # can start the next chunk right away
+                            self.thread_executor.submit(
+                                self.verify_chunk, chunk).add_done_callback(
+                                    put_completed(chunk, restart_count))
+                            pending += 1
+                            continue
+
+                        if future.result():
+                            continue
+                        # output is broken or missing, encode it again within the same restart limit
+                        restart_count += 1
+                        if restart_count < 3:
+                            executor.submit(encode_chunk, self.project, chunk,
+                                            restart_count).add_done_callback(
+                                                put_completed(chunk))
+                            pending += 1
+                        else:
+                            msg = f'::FATAL::\n::Chunk #{chunk.index} failed more than 3 times, shutting down thread\n\n'
+                            log(msg)
+                            print(msg)
+                            self.status = 'FATAL'
+                except Exception as exc:
+                    _, _, exc_tb = sys.exc_info()
+                    print(f'Encoding error {exc}\nAt line {exc_tb.tb_lineno}')
+                    terminate()
+
+    def verify_remaining(self):
         """
-        Encodes a chunk. If chunk fails, restarts it limited amount of times.
-        Return if executed just fine, sets status fatal for queue if failed
+        Checks encodes that finished after the encoding loop stopped handling them,
+        so they are saved as done for resuming instead of being encoded again
 
-        :param chunk: The chunk to encode
         :return: None
         """
-        restart_count = 0
-
-        while restart_count < 3:
-            try:
-                st_time = time.time()
-
-                chunk_frames = chunk.frames
-
-                log(f'Enc: {chunk.index}, {chunk_frames} fr\n\n')
-
-                # Target Quality Mode
-                if self.project.target_quality:
-                    if self.project.target_quality_method == 'per_shot':
-                        per_shot_target_quality_routine(self.project, chunk)
-                    if self.project.target_quality_method == 'per_frame':
-                        per_frame_target_quality_routine(self.project, chunk)
+        while not self.completed.empty():
+            future, chunk, restart_count = self.completed.get_nowait()
+            # finished frame checks already marked their chunk
+            if restart_count is not None or future.cancelled():
+                continue
+            if future.exception() is None and future.result() is not None:
+                self.thread_executor.submit(self.verify_chunk, chunk)
+
+    def verify_chunk(self, chunk: Chunk) -> bool:
+        """
+        Checks the frame count of an encoded chunk and marks it as done if it matches
 
-                ENCODERS[self.project.encoder].on_before_chunk(
-                    self.project, chunk)
+        :param chunk: the encoded chunk
+        :return: False if the output couldn't be probed and has to be encoded again
+        """
+        try:
+            # get the number of encoded frames, if no check assume it worked and encoded same number of frames
+            encoded_frames = chunk.frames if self.project.no_check else frame_check_output(
+                chunk, chunk.frames)
+
+            # write this chunk as done if it encoded correctly
+            if encoded_frames == chunk.frames:
+                self.done_tracker.mark(chunk, encoded_frames)
+            return True
+        except Exception as e:
+            msg = f':: Chunk #{chunk.index} frame check failed with:\n:: Exception: {type(e)}\n {e}\n:: Restarting chunk\n'
+            log(msg + '\n')
+            print(msg)
+            return False
 
-                # skip first pass if reusing
-                start = 2 if self.project.reuse_first_pass and self.project.passes >= 2 else 1
 
-                # Run all passes for this chunk
-                for current_pass in range(start, self.project.passes + 1):
-                    tqdm_bar(self.project, chunk, self.project.encoder,
-                             self.project.counter, chunk_frames,
-                             self.project.passes, current_pass)
+def init_worker(log_path):
+    """
+    Initializer for worker processes. Spawned workers start with a fresh
+    logger, so point it to the same log file as the main process
 
-                ENCODERS[self.project.encoder].on_after_chunk(
-                    self.project, chunk)
+    :param log_path: the log file of the main process
+    :return: None
+    """
+    if log_path:
+        log_file(log_path)
 
-                # get the number of encoded frames, if no check assume it worked and encoded same number of frames
-                encoded_frames = chunk_frames if self.project.no_check else self.frame_check_output(
-                    chunk, chunk_frames)
 
-                # write this chunk as done if it encoded correctly
-                if encoded_frames == chunk_frames:
-                    write_progress_file(Path(self.project.temp / 'done.json'),
-                                        chunk, encoded_frames)
+def encode_chunk(project: Project,
+                 chunk: Chunk,
+                 restart_count: int = 0) -> Optional[int]:
+    """
+    Encodes a chunk. If chunk fails, restarts it limited amount of times.
+    Runs inside of a worker process, so the result is only passed back with return value.
+    Frame count of the output is checked by the main process afterwards
+
+    :param project: the Project
+    :param chunk: The chunk to encode
+    :param restart_count: how many times the chunk was already restarted
+    :return: restart count the chunk was encoded with, None if it failed more than 3 times
+    """
+    # settings don't change between restarts
+    encoder_name = project.encoder
+    encoder = ENCODERS[encoder_name]
+    passes = project.passes
+    counter = project.counter
+    target_quality_method = project.target_quality_method if project.target_quality else None
+    chunk_frames = chunk.frames
+
+    # skip first pass if reusing
+    start = 2 if project.reuse_first_pass and passes >= 2 else 1
+
+    while restart_count < 3:
+        try:
+            st_time = time.perf_counter()
+
+            log(f'Enc: {chunk.index}, {chunk_frames} fr\n\n')
+
+            # Target Quality Mode
+            if target_quality_method == 'per_shot':
+                per_shot_target_quality_routine(project, chunk)
+            if target_quality_method == 'per_frame':
+                per_frame_target_quality_routine(project, chunk)
+
+            encoder.on_before_chunk(project, chunk)
+
+            # Run all passes for this chunk
+            for current_pass in range(start, passes + 1):
+                tqdm_bar(project, chunk, encoder_name, counter, chunk_frames,
+                         passes, current_pass)
+
+            encoder.on_after_chunk(project, chunk)
+
+            enc_time = round(time.perf_counter() - st_time, 2)
+            log(f'Done: {chunk.index} Fr: {chunk_frames}\n'
+                f'Fps: {round(chunk_frames / enc_time, 4)} Time: {enc_time} sec.\n\n'
+                )
+            return restart_count
+
+        except Exception as e:
+            msg = f':: Chunk #{chunk.index} crashed with:\n:: Exception: {type(e)}\n {e}\n:: Restarting chunk\n'
+            log(msg + '\n')
+            print(msg)
+            restart_count += 1
 
-                enc_time = round(time.time() - st_time, 2)
-                log(f'Done: {chunk.index} Fr: {encoded_frames}/{chunk_frames}\n'
-                    f'Fps: {round(encoded_frames / enc_time, 4)} Time: {enc_time} sec.\n\n'
-                    )
-                return
+    msg = f'::FATAL::\n::Chunk #{chunk.index} failed more than 3 times, shutting down thread\n\n'
+    log(msg)
+    print(msg)
+    return None
 
-            except Exception as e:
-                msg = f':: Chunk #{chunk.index} crashed with:\n:: Exception: {type(e)}\n {e}\n:: Restarting chunk\n'
-                log(msg + '\n')
-                print(msg)
-                restart_count += 1
 
-        msg = f'::FATAL::\n::Chunk #{chunk.index} failed more than 3 times, shutting down thread\n\n'
+def frame_check_output(chunk: Chunk, expected_frames: int) -> int:
+    actual_frames = frame_probe(chunk.output_path)
+    if actual_frames != expected_frames:
+        msg = f':: Chunk #{chunk.index}: {actual_frames}/{expected_frames} fr'
         log(msg)
         print(msg)
-        self.status = 'FATAL'
-
-    def frame_check_output(self,
-                           chunk: Chunk,
-                           expected_frames: int,
-                           last_chunk=False) -> int:
-        actual_frames = frame_probe(chunk.output_path)
-        if actual_frames != expected_frames:
-            msg = f':: Chunk #{chunk.index}: {actual_frames}/{expected_frames} fr'
-            log(msg)
-            print(msg)
-        return actual_frames
\ No newline at end of file
+    return actual_frames
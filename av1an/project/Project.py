@@ -3,10 +3,9 @@ import sys
 import os
 import shutil
 from psutil import virtual_memory
-from distutils.spawn import find_executable
 from pathlib import Path
 from av1an.commandtypes import Command
-from av1an.utils import frame_probe_fast, hash_path, terminate
+from av1an.utils import frame_probe_fast, hash_path, terminate, which
 from av1an.concat import vvc_concat, concatenate_ffmpeg, concatenate_mkvmerge
 from av1an.logger import log
 from av1an.vapoursynth import create_vs_file, frame_probe_vspipe
@@ -231,7 +230,7 @@ class Project(object):
         """
         Selecting best chunking method based on available methods
         """
-        if not find_executable('vspipe'):
+        if not which('vspipe'):
             self.chunk_method = 'hybrid'
             log('Set Chunking Method: Hybrid')
         else:
@@ -257,12 +256,16 @@ class Project(object):
         Checking required executables
         """
 
-        if not find_executable('ffmpeg'):
+        if not which('ffmpeg'):
             print('No ffmpeg')
             terminate()
 
+        if not which('ffprobe'):
+            print('No ffprobe')
+            terminate()
+
         if self.chunk_method in ['vs_ffms2', 'vs_lsmash']:
-            if not find_executable('vspipe'):
+            if not which('vspipe'):
                 print('vspipe executable not found')
                 terminate()
 
@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from threading import Lock
+from threading import Event, Lock, Thread
 
 done_file_lock = Lock()
 
@@ -23,22 +23,84 @@ def read_done_data(temp: Path):
     return data
 
 
-def write_progress_file(progress_file: Path, chunk, encoded_frames: int):
+class DoneTracker:
     """
-    Updates the given chunk in the progress (.temp/done.json) file
-
-    :param progress_file: the .temp/done.json file
-    :param chunk: the chunk that was finished
-    :param encoded_frames: how many frames were encoded for the chunk
-    :return: None
+    Collects finished chunks and writes them to the progress (.temp/done.json) file in batches,
+    instead of rewriting the whole file after every chunk
     """
-    try:
-        done_file_lock.acquire()
-        with progress_file.open() as f:
-            d = json.load(f)
-        d['done'][chunk.name] = encoded_frames
-        with progress_file.open('w') as f:
-            json.dump(d, f)
-    finally:
-        if done_file_lock.locked():
-            done_file_lock.release()
+    def __init__(self,
+                 progress_file: Path,
+                 flush_every: int = 16,
+                 flush_interval: float = 30):
+        """
+        :param progress_file: the .temp/done.json file
+        :param flush_every: write the file after this many finished chunks
+        :param flush_interval: write pending chunks every this many seconds while started
+        """
+        self.progress_file = progress_file
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.stop_event = Event()
+        self.flush_thread = None
+
+    def start(self):
+        """
+        Starts background thread that writes pending chunks every flush_interval seconds
+
+        :return: None
+        """
+        self.stop_event.clear()
+        self.flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self.flush_thread.start()
+
+    def stop(self):
+        """
+        Stops background thread and writes all pending chunks
+
+        :return: None
+        """
+        self.stop_event.set()
+        if self.flush_thread is not None:
+            self.flush_thread.join()
+            self.flush_thread = None
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def mark(self, chunk, encoded_frames: int):
+        """
+        Marks the given chunk as done, writing the progress file if enough chunks accumulated
+
+        :param chunk: the chunk that was finished
+        :param encoded_frames: how many frames were encoded for the chunk
+        :return: None
+        """
+        with done_file_lock:
+            self.pending[chunk.name] = encoded_frames
+            if len(self.pending) >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        """
+        Writes all pending chunks to the progress file
+
+        :return: None
+        """
+        with done_file_lock:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            with self.progress_file.open() as f:
+                d = json.load(f)
+            d['done'].update(self.pending)
+
+            # write to temporary file and swap, so done.json is never left half written
+            tmp_file = self.progress_file.with_suffix('.json.tmp')
+            with tmp_file.open('w') as f:
+                json.dump(d, f)
+            tmp_file.replace(self.progress_file)
+            self.pending = {}
@@ -15,7 +15,7 @@ except ImportError:
 
 from av1an.commandtypes import CommandPair
 from av1an.logger import log
-from av1an.utils import terminate, frame_probe_fast
+from av1an.utils import terminate, frame_probe_fast, set_pipe_size
 from av1an.vapoursynth import compose_vapoursynth_pipe
 
 # This is a script that returns a list of keyframes that aom would likely place. Port of aom's C code.
@@ -174,21 +174,19 @@ def compose_aomsplit_first_pass_command(video_path: Path, stat_file: Path, ffmpe
 
 
     # Adjust number of threads
-    video_params = ' '.join(video_params)
+    video_params = [re.sub(r'(--threads=[0-9]+)', f'--threads={min(32 ,os.cpu_count() * 3)}', x) for x in video_params]
 
-    video_params = re.sub(r'(--threads=[0-9]+)', f'--threads={min(32 ,os.cpu_count() * 3)}', video_params)
-
-    e = ['aomenc', '--passes=2', '--pass=1', *video_params.split(), f'--fpf={stat_file.as_posix()}', '-o', os.devnull, '-']
+    e = ['aomenc', '--passes=2', '--pass=1', *video_params, f'--fpf={stat_file.as_posix()}', '-o', os.devnull, '-']
     return CommandPair(f, e)
 
 
-def aom_keyframes(video_path: Path, stat_file, min_scene_len, ffmpeg_pipe, video_params, is_vs, quiet):
+def aom_keyframes(video_path: Path, stat_file, min_scene_len, ffmpeg_pipe, video_params, is_vs, quiet, total_frames=None):
     """[Get frame numbers for splits from aomenc 1 pass stat file]
     """
 
     log(f'Started aom_keyframes scenedetection\nParams: {video_params}\n')
 
-    total = frame_probe_fast(video_path, is_vs)
+    total = total_frames if total_frames else frame_probe_fast(video_path, is_vs)
 
     f, e = compose_aomsplit_first_pass_command(video_path, stat_file, ffmpeg_pipe, video_params, is_vs)
 
@@ -197,6 +195,7 @@ def aom_keyframes(video_path: Path, stat_file, min_scene_len, ffmpeg_pipe, video
         tqdm_bar = tqdm(total=total, initial=0, dynamic_ncols=True, unit="fr", leave=True, smoothing=0.2)
 
     ffmpeg_pipe = subprocess.Popen(f, stdout=PIPE, stderr=STDOUT)
+    set_pipe_size(ffmpeg_pipe.stdout)
     pipe = subprocess.Popen(e, stdin=ffmpeg_pipe.stdout, stdout=PIPE,
                             stderr=STDOUT, universal_newlines=True)
 
@@ -19,7 +19,8 @@ if sys.platform == "linux":
     from os import mkfifo
 
 
-def pyscene(video, threshold, min_scene_len, is_vs, temp, quiet):
+def pyscene(video, threshold, min_scene_len, is_vs, temp, quiet,
+            total_frames=None):
     """
     Running PySceneDetect detection on source video for segmenting.
     Optimal threshold settings 15-50
@@ -51,7 +52,7 @@ def pyscene(video, threshold, min_scene_len, is_vs, temp, quiet):
         # We need to pass the number of frames to the manager, otherwise it won't close the
         # receiving end of the pipe, and will simply sit waiting after vspipe has finished sending
         # the last frame.
-        frames = frame_probe(video)
+        frames = total_frames if total_frames else frame_probe(video)
 
     video_manager = VideoManager([str(vspipe_fifo if is_vs else video)])
     scene_manager = SceneManager()
@@ -2,6 +2,7 @@
 
 import os
 import subprocess
+import sys
 import json
 from pathlib import Path
 from subprocess import PIPE, STDOUT
@@ -15,6 +16,9 @@ from .utils import terminate, frame_probe
 
 # TODO: organize to single segmenting/splitting module
 
+# Maximum length of command line for CreateProcess
+WINDOWS_CMD_LIMIT = 32767
+
 
 def split_routine(project: Project, resuming: bool) -> List[int]:
     """
@@ -112,6 +116,18 @@ def segment(video: Path, temp: Path, frames: List[int]):
         cmd.append(os.path.join(temp, "split", "%05d.mkv"))
     else:
         cmd.append(os.path.join(temp, "split", "0.mkv"))
+
+    # All split frames are passed in a single argument, which can hit the command line length limit on Windows.
+    # Fail loudly instead of letting ffmpeg not start and leaving temp/split empty.
+    # Limit includes terminating null character
+    if sys.platform == 'win32' and len(
+            subprocess.list2cmdline(cmd)) >= WINDOWS_CMD_LIMIT:
+        er = f'Error: {len(frames)} split points exceed Windows command line length limit\n' \
+             'Use select or vapoursynth chunk method, or increase min_scene_len / extra_split\n'
+        print(er)
+        log(er)
+        terminate()
+
     pipe = subprocess.Popen(cmd, stdout=PIPE, stderr=STDOUT)
     while True:
         line = pipe.stdout.readline().strip()
@@ -165,7 +181,7 @@ def calc_split_locations(project: Project) -> List[int]:
         try:
             sc = pyscene(project.input, project.threshold,
                          project.min_scene_len, project.is_vs, project.temp,
-                         project.quiet)
+                         project.quiet, project.get_frames())
         except Exception as e:
             log(f'Error in PySceneDetect: {e}\n')
             print(f'Error in PySceneDetect{e}\n')
@@ -176,7 +192,7 @@ def calc_split_locations(project: Project) -> List[int]:
         stat_file = project.temp / 'keyframes.log'
         sc = aom_keyframes(project.input, stat_file, project.min_scene_len,
                            project.ffmpeg_pipe, aom_keyframes_params,
-                           project.is_vs, project.quiet)
+                           project.is_vs, project.quiet, project.get_frames())
 
     elif project.split_method == 'ffmpeg':
         sc = ffmpeg(project.input, project.threshold, project.min_scene_len,
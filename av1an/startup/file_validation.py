@@ -1,5 +1,4 @@
 #!/bin/env python
-import numpy as np
 
 
 def process_inputs(inputs):
@@ -21,12 +20,10 @@ def process_inputs(inputs):
         else:
             input_list.append(item)
 
-    valid = np.array([i.exists() for i in input_list])
+    missing = [x for x in input_list if not x.exists()]
 
-    if not all(valid):
-        print(
-            f'File(s) do not exist: {", ".join([str(input_list[i]) for i in np.where(not valid)[0]])}'
-        )
+    if missing:
+        print(f'File(s) do not exist: {", ".join([str(x) for x in missing])}')
         exit()
 
     return input_list
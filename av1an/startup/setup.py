@@ -80,8 +80,8 @@ def startup_check(project: Project):
     Performing essential checks at startup_check
     Set constant values
     """
-    if sys.version_info < (3, 6):
-        print('Python 3.6+ required')
+    if sys.version_info < (3, 7):
+        print('Python 3.7+ required')
         sys.exit()
     if sys.platform == 'linux':
 
@@ -1,5 +1,6 @@
 import subprocess
 
+from functools import lru_cache
 from math import isnan
 import numpy as np
 import re
@@ -12,6 +13,7 @@ from av1an.commandtypes import CommandPair, Command
 from av1an.project import Project
 from av1an.chunk import Chunk
 from av1an.manager.Pipes import process_pipe
+from av1an.utils import set_pipe_size
 try:
     import matplotlib
     from matplotlib import pyplot as plt
@@ -113,19 +115,50 @@ def get_target_q(scores, target_quality):
     Interpolating scores to get Q closest to target
     Interpolation type for 2 probes changes to linear
     """
-    x = [x[1] for x in sorted(scores)]
-    y = [float(x[0]) for x in sorted(scores)]
+    x, y = probes_to_arrays(scores)
 
     if len(x) > 2:
         interpolation = 'quadratic'
     else:
         interpolation = 'linear'
     f = interpolate.interp1d(x, y, kind=interpolation)
-    xnew = np.linspace(min(x), max(x), max(x) - min(x))
-    tl = list(zip(xnew, f(xnew)))
-    q = min(tl, key=lambda l: abs(l[1] - target_quality))
+    xnew = np.linspace(x.min(), x.max(), x.max() - x.min())
+    ynew = f(xnew)
+    i = closest_index(ynew, target_quality)
 
-    return int(q[0]), round(q[1], 3)
+    return int(xnew[i]), round(float(ynew[i]), 3)
+
+
+def closest_index(values: np.ndarray, target) -> int:
+    """
+    Returns index of the value closest to target, ignoring NaN
+
+    :param values: array of interpolated values
+    :param target: searched value
+    :return: index in values, 0 if all values are NaN
+    """
+    distance = np.abs(values - target)
+    # nanargmin raises on all NaN, min() with key used to return the first value
+    if np.isnan(distance).all():
+        return 0
+    return int(np.nanargmin(distance))
+
+
+def probes_to_arrays(vmaf_cq):
+    """
+    Sorts probes once and splits them into arrays of q values and scores
+
+    :param vmaf_cq: list of (score, q) tuples
+    :return: x - q values, y - scores
+    """
+    vmaf_cq_sorted = sorted(vmaf_cq)
+    x = np.fromiter((t[1] for t in vmaf_cq_sorted),
+                    dtype=np.int32,
+                    count=len(vmaf_cq_sorted))
+    y = np.fromiter((float(t[0]) for t in vmaf_cq_sorted),
+                    dtype=np.float64,
+                    count=len(vmaf_cq_sorted))
+    return x, y
 
 
 def weighted_search(num1, vmaf1, num2, vmaf2, target):
@@ -149,6 +182,22 @@ def weighted_search(num1, vmaf1, num2, vmaf2, target):
     return new_point
 
 
+# Fastest SvtAv1EncApp preset and the settings per-shot probes encode with
+SVT_AV1_PROBE_PRESET = '8'
+SVT_AV1_PROBE_PARAMS = [
+    '--tile-rows', '1', '--tile-columns', '2', '--hme', '0', '--pred-struct',
+    '0', '--sg-filter-mode', '0', '--enable-restoration-filtering', '0',
+    '--cdef-level', '0', '--disable-dlf', '0', '--mrp-level', '0',
+    '--enable-tpl-la', '0', '--enable-mfmv', '0', '--enable-local-warp', '0',
+    '--enable-global-motion', '0', '--enable-interintra-comp', '0',
+    '--obmc-level', '0', '--rdoq-level', '0', '--filter-intra-level', '0',
+    '--enable-intra-edge-filter', '0', '--enable-pic-based-rate-est', '0',
+    '--pred-me', '0', '--bipred-3x3', '0', '--compound', '0',
+    '--use-default-me-hme', '0', '--ext-block', '0', '--hbd-md', '0',
+    '--palette-level', '0', '--umv', '0', '--tf-level', '3'
+]
+
+
 def probe_cmd(chunk: Chunk, q, ffmpeg_pipe, encoder, probing_rate,
               n_threads) -> CommandPair:
     """
@@ -200,18 +249,7 @@ def probe_cmd(chunk: Chunk, q, ffmpeg_pipe, encoder, probing_rate,
     elif encoder == 'svt_av1':
         params = [
             'SvtAv1EncApp', '-i', 'stdin', '--lp', f'{n_threads}', '--preset',
-            '8', '-q', f'{q}', '--tile-rows', '1', '--tile-columns', '2',
-            '--hme', '0', '--pred-struct', '0', '--sg-filter-mode', '0',
-            '--enable-restoration-filtering', '0', '--cdef-level', '0',
-            '--disable-dlf', '0', '--mrp-level', '0', '--enable-tpl-la', '0',
-            '--enable-mfmv', '0', '--enable-local-warp', '0',
-            '--enable-global-motion', '0', '--enable-interintra-comp', '0',
-            '--obmc-level', '0', '--rdoq-level', '0', '--filter-intra-level',
-            '0', '--enable-intra-edge-filter', '0',
-            '--enable-pic-based-rate-est', '0', '--pred-me', '0',
-            '--bipred-3x3', '0', '--compound', '0', '--use-default-me-hme',
-            '0', '--ext-block', '0', '--hbd-md', '0', '--palette-level', '0',
-            '--umv', '0', '--tf-level', '3'
+            SVT_AV1_PROBE_PRESET, '-q', f'{q}', *SVT_AV1_PROBE_PARAMS
         ]
         cmd = CommandPair(pipe, [*params, '-b', probe_name, '-'])
 
@@ -246,11 +284,13 @@ def make_pipes(ffmpeg_gen_cmd: Command, command: CommandPair):
     ffmpeg_gen_pipe = subprocess.Popen(ffmpeg_gen_cmd,
                                        stdout=subprocess.PIPE,
                                        stderr=subprocess.STDOUT)
+    set_pipe_size(ffmpeg_gen_pipe.stdout)
 
     ffmpeg_pipe = subprocess.Popen(command[0],
                                    stdin=ffmpeg_gen_pipe.stdout,
                                    stdout=subprocess.PIPE,
                                    stderr=subprocess.STDOUT)
+    set_pipe_size(ffmpeg_pipe.stdout)
 
     pipe = subprocess.Popen(command[1],
                             stdin=ffmpeg_pipe.stdout,
@@ -261,6 +301,21 @@ def make_pipes(ffmpeg_gen_cmd: Command, command: CommandPair):
     return pipe
 
 
+@lru_cache(maxsize=None)
+def get_vmaf(n_threads, model, res, vmaf_filter) -> VMAF:
+    """
+    Returns VMAF runner for given settings.
+    Creating VMAF does a validation run of libvmaf, so it is done once per
+    process instead of for every probe
+
+    :return: VMAF object
+    """
+    return VMAF(n_threads=n_threads,
+                model=model,
+                res=res,
+                vmaf_filter=vmaf_filter)
+
+
 def vmaf_probe(chunk: Chunk, q, project: Project, probing_rate):
     """
     Calculates vmaf and returns path to json file
@@ -277,10 +332,8 @@ def vmaf_probe(chunk: Chunk, q, project: Project, probing_rate):
                     probing_rate, n_threads)
     pipe = make_pipes(chunk.ffmpeg_gen_cmd, cmd)
     process_pipe(pipe, chunk)
-    vm = VMAF(n_threads=project.n_threads,
-              model=project.vmaf_path,
-              res=project.vmaf_res,
-              vmaf_filter=project.vmaf_filter)
+    vm = get_vmaf(project.n_threads, project.vmaf_path, project.vmaf_res,
+                  project.vmaf_filter)
     file = vm.call_vmaf(chunk,
                         gen_probes_names(chunk, q),
                         vmaf_rate=probing_rate)
@@ -304,17 +357,16 @@ def get_closest(q_list, q, positive=True):
     return min(q_list, key=lambda x: abs(x - q))
 
 
-def interpolate_data(vmaf_cq: list, target_quality):
-    x = [x[1] for x in sorted(vmaf_cq)]
-    y = [float(x[0]) for x in sorted(vmaf_cq)]
-
+def interpolate_data(x: np.ndarray, y: np.ndarray, target_quality):
     # Interpolate data
     f = interpolate.interp1d(x, y, kind='quadratic')
-    xnew = np.linspace(min(x), max(x), max(x) - min(x))
+    xnew = np.linspace(x.min(), x.max(), x.max() - x.min())
+    ynew = f(xnew)
 
     # Getting value closest to target
-    tl = list(zip(xnew, f(xnew)))
-    target_quality_cq = min(tl, key=lambda l: abs(l[1] - target_quality))
+    i = closest_index(ynew, target_quality)
+    target_quality_cq = (xnew[i], ynew[i])
+    tl = list(zip(xnew, ynew))
     return target_quality_cq, tl, f, xnew
 
 
@@ -325,10 +377,9 @@ def plot_probes(project, vmaf_cq, chunk: Chunk, frames):
         return
     # Saving plot of vmaf calculation
 
-    x = [x[1] for x in sorted(vmaf_cq)]
-    y = [float(x[0]) for x in sorted(vmaf_cq)]
+    x, y = probes_to_arrays(vmaf_cq)
 
-    cq, tl, f, xnew = interpolate_data(vmaf_cq, project.target_quality)
+    cq, tl, f, xnew = interpolate_data(x, y, project.target_quality)
     matplotlib.use('agg')
     plt.ioff()
     plt.plot(xnew, f(xnew), color='tab:blue', alpha=1)
@@ -351,6 +402,9 @@ def plot_probes(project, vmaf_cq, chunk: Chunk, frames):
 def per_shot_target_quality(chunk: Chunk, project: Project):
     vmaf_cq = []
     frames = chunk.frames
+    min_q, max_q = project.min_q, project.max_q
+    target_quality = project.target_quality
+    probes = project.probes
 
     # get_scene_scores(chunk, project.ffmpeg_pipe)
     # Adapt probing rate
@@ -363,7 +417,7 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
     score = 0
 
     # Make middle probe
-    middle_point = (project.min_q + project.max_q) // 2
+    middle_point = (min_q + max_q) // 2
     q_list.append(middle_point)
     last_q = middle_point
 
@@ -371,7 +425,7 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
         vmaf_probe(chunk, last_q, project, probing_rate))
     vmaf_cq.append((score, last_q))
 
-    if project.probes < 3:
+    if probes < 3:
         #Use Euler's method with known relation between cq and vmaf
         vmaf_cq_deriv = -0.18
         ## Formula -ln(1-score/100) = vmaf_cq_deriv*last_q + constant
@@ -379,17 +433,17 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
         ## Formula -ln(1-project.vmaf_target/100) = vmaf_cq_deriv*cq + constant
         #cq = (-ln(1-project.vmaf_target/100) - constant)/vmaf_cq_deriv
         next_q = int(
-            round(last_q + (VMAF.transform_vmaf(project.target_quality) -
+            round(last_q + (VMAF.transform_vmaf(target_quality) -
                             VMAF.transform_vmaf(score)) / vmaf_cq_deriv))
 
         #Clamp
-        if next_q < project.min_q:
-            next_q = project.min_q
-        if project.max_q < next_q:
-            next_q = project.max_q
+        if next_q < min_q:
+            next_q = min_q
+        if max_q < next_q:
+            next_q = max_q
 
         #Single probe cq guess or exit to avoid divide by zero
-        if project.probes == 1 or next_q == last_q:
+        if probes == 1 or next_q == last_q:
             return next_q
 
         #Second probe at guessed value
@@ -402,14 +456,14 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
 
         #Same deal different slope
         next_q = int(
-            round(next_q + (VMAF.transform_vmaf(project.target_quality) -
+            round(next_q + (VMAF.transform_vmaf(target_quality) -
                             VMAF.transform_vmaf(score_2)) / vmaf_cq_deriv))
 
         #Clamp
-        if next_q < project.min_q:
-            next_q = project.min_q
-        if project.max_q < next_q:
-            next_q = project.max_q
+        if next_q < min_q:
+            next_q = min_q
+        if max_q < next_q:
+            next_q = max_q
 
         return next_q
 
@@ -420,26 +474,26 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
     vmaf_cq_upper = last_q
 
     # Branch
-    if score < project.target_quality:
-        next_q = project.min_q
-        q_list.append(project.min_q)
+    if score < target_quality:
+        next_q = min_q
+        q_list.append(min_q)
     else:
-        next_q = project.max_q
-        q_list.append(project.max_q)
+        next_q = max_q
+        q_list.append(max_q)
 
     # Edge case check
     score = VMAF.read_weighted_vmaf(
         vmaf_probe(chunk, next_q, project, probing_rate))
     vmaf_cq.append((score, next_q))
 
-    if next_q == project.min_q and score < project.target_quality:
+    if next_q == min_q and score < target_quality:
         log(f"Chunk: {chunk.name}, Rate: {probing_rate}, Fr: {frames}\n"
             f"Q: {sorted([x[1] for x in vmaf_cq])}, Early Skip Low CQ\n"
             f"Vmaf: {sorted([x[0] for x in vmaf_cq], reverse=True)}\n"
             f"Target Q: {vmaf_cq[-1][1]} VMAF: {round(vmaf_cq[-1][0], 2)}\n\n")
         return next_q
 
-    elif next_q == project.max_q and score > project.target_quality:
+    elif next_q == max_q and score > target_quality:
         log(f"Chunk: {chunk.name}, Rate: {probing_rate}, Fr: {frames}\n"
             f"Q: {sorted([x[1] for x in vmaf_cq])}, Early Skip High CQ\n"
             f"Vmaf: {sorted([x[0] for x in vmaf_cq], reverse=True)}\n"
@@ -447,7 +501,7 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
         return next_q
 
     # Set boundary
-    if score < project.target_quality:
+    if score < target_quality:
         vmaf_lower = score
         vmaf_cq_lower = next_q
     else:
@@ -455,9 +509,9 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
         vmaf_cq_upper = next_q
 
     # VMAF search
-    for _ in range(project.probes - 2):
+    for _ in range(probes - 2):
         new_point = weighted_search(vmaf_cq_lower, vmaf_lower, vmaf_cq_upper,
-                                    vmaf_upper, project.target_quality)
+                                    vmaf_upper, target_quality)
         if new_point in [x[1] for x in vmaf_cq]:
             break
 
@@ -467,14 +521,14 @@ def per_shot_target_quality(chunk: Chunk, project: Project):
         vmaf_cq.append((score, new_point))
 
         # Update boundary
-        if score < project.target_quality:
+        if score < target_quality:
             vmaf_lower = score
             vmaf_cq_lower = new_point
         else:
             vmaf_upper = score
             vmaf_cq_upper = new_point
 
-    q, q_vmaf = get_target_q(vmaf_cq, project.target_quality)
+    q, q_vmaf = get_target_q(vmaf_cq, target_quality)
 
     log(f'Chunk: {chunk.name}, Rate: {probing_rate}, Fr: {frames}\n'
         f'Q: {sorted([x[1] for x in vmaf_cq])}\n'
@@ -530,8 +584,8 @@ def per_frame_probe_cmd(chunk: Chunk, q, ffmpeg_pipe, encoder, probing_rate,
     probe_name = gen_probes_names(chunk, q).with_suffix('.ivf').as_posix()
     if encoder == 'svt_av1':
         params = [
-            'SvtAv1EncApp', '-i', 'stdin', '--preset', '8', '--rc', '0',
-            '--passes', '1', '--use-q-file', '1', '--qpfile',
+            'SvtAv1EncApp', '-i', 'stdin', '--preset', SVT_AV1_PROBE_PRESET,
+            '--rc', '0', '--passes', '1', '--use-q-file', '1', '--qpfile',
             f'{qp_file.as_posix()}'
         ]
 
@@ -557,10 +611,8 @@ def per_frame_probe(q_list, q, chunk, project):
                               1, qfile)
     pipe = make_pipes(chunk.ffmpeg_gen_cmd, cmd)
     process_pipe(pipe, chunk)
-    vm = VMAF(n_threads=project.n_threads,
-              model=project.vmaf_path,
-              res=project.vmaf_res,
-              vmaf_filter=project.vmaf_filter)
+    vm = get_vmaf(project.n_threads, project.vmaf_path, project.vmaf_res,
+                  project.vmaf_filter)
     fl = vm.call_vmaf(chunk, gen_probes_names(chunk, q))
     jsn = VMAF.read_json(fl)
     vmafs = [x['metrics']['vmaf'] for x in jsn['frames']]
@@ -627,10 +679,9 @@ def gen_next_q(frame_list, chunk, project):
 
             f = interpolate.interp1d(x, y, kind=interpolation)
             xnew = np.linspace(min(x), max(x), max(x) - min(x))
-            tl = list(zip(xnew, f(xnew)))
-            q = min(tl, key=lambda l: abs(l[1] - project.target_quality))
+            i = closest_index(f(xnew), project.target_quality)
 
-            q_list.append(int(round(q[0])))
+            q_list.append(int(round(xnew[i])))
 
         return q_list
 
@@ -1,6 +1,7 @@
 #!/bin/env python
 
 import re
+import shutil
 import sys
 from typing import List
 from pathlib import Path
@@ -11,11 +12,49 @@ import hashlib
 from av1an.ffmpeg import frame_probe_ffmpeg
 from av1an.vapoursynth import frame_probe_vspipe, is_vapoursynth
 
+# Results of executable lookups in PATH
+_which_cache = {}
+
+# Size of the kernel buffer for pipes between ffmpeg and encoders
+PIPE_SIZE = 1 << 20
+
 
 def terminate():
     sys.exit(1)
 
 
+def which(exe: str):
+    """
+    Finds executable in PATH, caching the result so repeated checks don't rescan PATH
+
+    :param exe: name of the executable
+    :return: path to the executable or None if not found
+    """
+    if exe not in _which_cache:
+        _which_cache[exe] = shutil.which(exe)
+    return _which_cache[exe]
+
+
+def set_pipe_size(pipe, size: int = PIPE_SIZE):
+    """
+    Enlarges kernel buffer of the pipe, so raw frames piped between processes
+    take less read/write calls and context switches.
+    Only supported on Linux, does nothing on other platforms
+
+    :param pipe: file object of the pipe, ex: Popen.stdout
+    :param size: new buffer size in bytes
+    """
+    if sys.platform != 'linux':
+        return
+
+    import fcntl
+    try:
+        fcntl.fcntl(pipe.fileno(), getattr(fcntl, 'F_SETPIPE_SZ', 1031), size)
+    except OSError:
+        # size is limited by /proc/sys/fs/pipe-max-size, keep default buffer
+        pass
+
+
 def hash_path(s: str) -> int:
     """
     Return hash of full path to file
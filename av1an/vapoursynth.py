@@ -1,7 +1,6 @@
 import re
 from subprocess import PIPE
 from pathlib import Path
-from shlex import split
 from subprocess import run, Popen
 
 VS_EXTENSIONS = ['.vpy', '.py']
@@ -16,8 +15,8 @@ def frame_probe_vspipe(source: Path):
     Get frame count from vspipe.
     :param: source: Path to input vapoursynth (vpy/py) file
     """
-    cmd = f"vspipe -i {source.as_posix()}  -"
-    r = run(split(cmd), capture_output=True)
+    cmd = ['vspipe', '-i', source.as_posix(), '-']
+    r = run(cmd, capture_output=True)
     matches = re.findall(r"Frames:\s*([0-9]+)\s",
                          r.stderr.decode("utf-8") + r.stdout.decode("utf-8"))
     frames = int(matches[-1])
@@ -46,8 +45,8 @@ def create_vs_file(temp, source, chunk_method):
     with open(load_script, 'w+') as file:
         file.write(script.format(source.resolve().as_posix(), cache_file))
 
-    cache_generation = f'vspipe -i {load_script.as_posix()} -i -'
-    d = Popen(split(cache_generation), stdout=PIPE, stderr=PIPE).wait()
+    cache_generation = ['vspipe', '-i', load_script.as_posix(), '-i', '-']
+    d = Popen(cache_generation, stdout=PIPE, stderr=PIPE).wait()
 
     return load_script
 
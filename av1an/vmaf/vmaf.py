@@ -25,6 +25,7 @@ except ImportError:
 
 from av1an.manager.Pipes import process_pipe
 from av1an.chunk import Chunk
+from av1an.utils import set_pipe_size
 
 
 class VMAF:
@@ -45,8 +46,11 @@ class VMAF:
         else:
             add = ''
 
-        cmd = f' ffmpeg -hide_banner -filter_complex testsrc=duration=1:size=1920x1080:rate=1[B];testsrc=duration=1:size=1920x1080:rate=1[A];[B][A]libvmaf{add} -t 1  -f null - '.split(
-        )
+        cmd = [
+            'ffmpeg', '-hide_banner', '-filter_complex',
+            f'testsrc=duration=1:size=1920x1080:rate=1[B];testsrc=duration=1:size=1920x1080:rate=1[A];[B][A]libvmaf{add}',
+            '-t', '1', '-f', 'null', '-'
+        ]
 
         pipe = subprocess.Popen(cmd,
                                 stdout=PIPE,
@@ -131,6 +135,7 @@ class VMAF:
         ffmpeg_gen_pipe = subprocess.Popen(chunk.ffmpeg_gen_cmd,
                                            stdout=PIPE,
                                            stderr=STDOUT)
+        set_pipe_size(ffmpeg_gen_pipe.stdout)
 
         pipe = subprocess.Popen(cmd,
                                 stdin=ffmpeg_gen_pipe.stdout,